@@ -1,4 +1,6 @@
 import os
+import sys
+import functools
 from azure.core.credentials import AzureKeyCredential
 from azure.search.documents.indexes import SearchIndexClient
 from azure.search.documents.indexes.models import (
@@ -9,11 +11,15 @@ from azure.search.documents.indexes.models import (
     SearchFieldDataType,
     VectorSearch,
     HnswAlgorithmConfiguration,
+    HnswParameters,
+    VectorSearchAlgorithmMetric,
     VectorSearchProfile,
     SemanticConfiguration,
     SemanticPrioritizedFields,
     SemanticField,
     SemanticSearch,
+    ScoringProfile,
+    TextWeights,
     AzureOpenAIVectorizer,
     AzureOpenAIVectorizerParameters
 )
@@ -22,8 +28,21 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
-def create_semantic_search_index():
-    """Create an Azure AI Search index with semantic search and vector capabilities"""
+@functools.lru_cache(maxsize=8)
+def _index_client(endpoint, api_key):
+    """Return a SearchIndexClient for the endpoint, reused across calls so its connection pool is kept"""
+    return SearchIndexClient(
+        endpoint=endpoint,
+        credential=AzureKeyCredential(api_key)
+    )
+
+def create_semantic_search_index(rebuild=False):
+    """Create an Azure AI Search index with semantic search and vector capabilities
+
+    Azure AI Search cannot change field attributes (e.g. searchable) or the vector
+    metric of an existing index in place. Pass rebuild=True (or --rebuild on the
+    command line) to delete and recreate the index; its documents must be re-uploaded.
+    """
     
     # Use the new endpoint with semantic search
     endpoint = "https://testing-vecflow-1.search.windows.net"
@@ -58,11 +77,8 @@ def create_semantic_search_index():
     print(f"Embedding Deployment: {azure_openai_deployment}")
     print("=" * 60)
     
-    # Create index client
-    index_client = SearchIndexClient(
-        endpoint=endpoint,
-        credential=AzureKeyCredential(api_key)
-    )
+    # Create (or reuse) the index client
+    index_client = _index_client(endpoint, api_key)
     
     # Define the fields for the index
     fields = [
@@ -87,10 +103,9 @@ def create_semantic_search_index():
             searchable=True,
             retrievable=True
         ),
-        SearchableField(
+        SimpleField(
             name="url",
             type=SearchFieldDataType.String,
-            searchable=True,
             retrievable=True,
             sortable=True,
             filterable=True
@@ -113,6 +128,7 @@ def create_semantic_search_index():
             name="vector",
             type=SearchFieldDataType.Collection(SearchFieldDataType.Single),
             searchable=True,
+            hidden=True,  # Not returned with results; avoids shipping 1536 floats per hit
             vector_search_dimensions=1536,
             vector_search_profile_name="vector-profile"
         )
@@ -129,7 +145,15 @@ def create_semantic_search_index():
         ],
         algorithms=[
             HnswAlgorithmConfiguration(
-                name="hnsw-config"
+                name="hnsw-config",
+                # Explicit HNSW settings: m at the service maximum (valid range 4-10), ef values
+                # within 100-1000; cosine matches the normalized output of text-embedding-ada-002
+                parameters=HnswParameters(
+                    m=10,
+                    ef_construction=400,
+                    ef_search=200,
+                    metric=VectorSearchAlgorithmMetric.COSINE
+                )
             )
         ],
         vectorizers=[
@@ -154,29 +178,45 @@ def create_semantic_search_index():
                     title_field=SemanticField(field_name="title"),
                     content_fields=[
                         SemanticField(field_name="chunk")
-                    ],
-                    keywords_fields=[
-                        SemanticField(field_name="url")
                     ]
                 )
             )
         ]
     )
     
+    # Boost title matches so first-stage BM25 ranking is good enough for simple queries
+    scoring_profiles = [
+        ScoringProfile(
+            name="title_boost",
+            text_weights=TextWeights(
+                weights={
+                    "title": 5.0,
+                    "chunk": 1.0
+                }
+            )
+        )
+    ]
+    
     # Create the search index
     index = SearchIndex(
         name=index_name,
         fields=fields,
         vector_search=vector_search,
-        semantic_search=semantic_search
+        semantic_search=semantic_search,
+        scoring_profiles=scoring_profiles,
+        default_scoring_profile="title_boost"
     )
     
     # Create or update the index
     try:
+        if rebuild and index_name in index_client.list_index_names():
+            print(f"Deleting existing index '{index_name}' so it can be rebuilt...")
+            index_client.delete_index(index_name)
         result = index_client.create_or_update_index(index)
         print(f"✓ Index '{result.name}' created/updated successfully!")
         print(f"  - Semantic search enabled with configuration: 'fraunhofer-rag-semantic-config'")
         print(f"  - Vector search enabled with profile: 'vector-profile'")
+        print("  - Default scoring profile: 'title_boost'")
         print(f"  - Vectorizer: 'openai-vectorizer' (Azure OpenAI text-embedding-ada-002)")
         print(f"  - Fields: id, title, chunk, url, creationTime, lastModifiedTime, vector")
         
@@ -193,8 +233,11 @@ def create_semantic_search_index():
         
     except Exception as e:
         print(f"✗ Error creating index: {e}")
+        if not rebuild:
+            print("If the index already exists with different fields or vector settings, "
+                  "rerun with --rebuild to recreate it (documents must be re-uploaded).")
         import traceback
         traceback.print_exc()
 
 if __name__ == "__main__":
-    create_semantic_search_index() 
\ No newline at end of file
+    create_semantic_search_index(rebuild="--rebuild" in sys.argv[1:]) 
\ No newline at end of file
@@ -2,118 +2,159 @@
 Diagnostic script to check Weaviate connectivity and health.
 """
 
+import io
 import os
+import sys
 import asyncio
-import aiohttp
+import httpx
+from contextlib import AsyncExitStack
 from dotenv import load_dotenv
-import weaviate
-from urllib.parse import urlparse
+from urllib.parse import urlsplit
 
 # Load environment variables
 load_dotenv()
 
-async def check_weaviate_health():
-    """Check various aspects of Weaviate connectivity."""
+# Parse the Weaviate URL once and derive the connection settings from it
+WEAVIATE_URL = os.getenv("WEAVIATE_URL")
+_URL = urlsplit(WEAVIATE_URL or "")
+_IS_CLOUD = bool(_URL.hostname) and _URL.hostname.endswith(('.weaviate.cloud', '.weaviate.network'))
+_HTTP_SECURE = _URL.scheme == 'https'
+_HTTP_PORT = _URL.port or (443 if _HTTP_SECURE else 8080)
+
+# httpx only speaks HTTP/2 when the optional h2 package is installed
+try:
+    import h2  # noqa: F401
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+def create_async_client(weaviate_api_key):
+    """Create an (unconnected) async Weaviate client for WEAVIATE_URL."""
+    # Imported lazily: the Weaviate client pulls in grpc/protobuf
+    import weaviate
+    import weaviate.auth
     
-    weaviate_url = os.getenv("WEAVIATE_URL")
-    weaviate_api_key = os.getenv("WEAVIATE_API_KEY")
+    if _IS_CLOUD:
+        return weaviate.use_async_with_weaviate_cloud(
+            cluster_url=WEAVIATE_URL,
+            auth_credentials=weaviate.auth.Auth.api_key(weaviate_api_key)
+        )
     
-    if not weaviate_url:
-        print("❌ WEAVIATE_URL environment variable not set!")
-        return
+    http_host = _URL.hostname
+    http_port = _HTTP_PORT
+    http_secure = _HTTP_SECURE
+    grpc_port = 50051
+    grpc_secure = http_secure
     
-    print(f"🔍 Checking Weaviate instance at: {weaviate_url}")
-    print("-" * 50)
-    
-    # 1. Check HTTP/REST API connectivity
-    print("\n1. Checking REST API connectivity...")
+    return weaviate.use_async_with_custom(
+        http_host=http_host,
+        http_port=http_port,
+        http_secure=http_secure,
+        grpc_host=http_host,
+        grpc_port=grpc_port,
+        grpc_secure=grpc_secure,
+        auth_credentials=weaviate.auth.Auth.api_key(weaviate_api_key) if weaviate_api_key else None
+    )
+
+async def check_rest(http_client, out=sys.stdout):
+    """1. Check HTTP/REST API connectivity. Returns True if the instance is ready."""
+    print("\n1. Checking REST API connectivity...", file=out)
     try:
-        async with aiohttp.ClientSession() as session:
-            headers = {"Authorization": f"Bearer {weaviate_api_key}"} if weaviate_api_key else {}
-            
-            # Check health endpoint
-            health_url = f"{weaviate_url}/v1/.well-known/ready"
-            async with session.get(health_url, headers=headers) as response:
-                if response.status == 200:
-                    print(f"✅ REST API is healthy (status: {response.status})")
-                else:
-                    print(f"❌ REST API returned status: {response.status}")
-                    text = await response.text()
-                    print(f"   Response: {text}")
-                    
-            # Check schema endpoint
-            schema_url = f"{weaviate_url}/v1/schema"
-            async with session.get(schema_url, headers=headers) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    print(f"✅ Schema endpoint accessible")
-                    print(f"   Found {len(data.get('classes', []))} classes")
-                    for cls in data.get('classes', []):
-                        print(f"   - {cls['class']}")
-                else:
-                    print(f"❌ Schema endpoint returned status: {response.status}")
-                    
+        # Check health endpoint
+        response = await http_client.get("/v1/.well-known/ready")
+        if response.status_code == 200:
+            print(f"✅ REST API is healthy (status: {response.status_code})", file=out)
+            return True
+        else:
+            print(f"❌ REST API returned status: {response.status_code}", file=out)
+            print(f"   Response: {response.text}", file=out)
+                
     except Exception as e:
-        print(f"❌ REST API connection failed: {str(e)}")
-    
-    # 2. Check gRPC connectivity
-    print("\n2. Checking gRPC connectivity...")
+        print(f"❌ REST API connection failed: {str(e)}", file=out)
+    return False
+
+async def check_grpc(stack, weaviate_api_key, out=sys.stdout):
+    """2. Check gRPC connectivity. Returns True if collections could be listed."""
+    print("\n2. Checking gRPC connectivity...", file=out)
     try:
-        parsed_url = urlparse(weaviate_url)
-        is_weaviate_cloud = '.weaviate.cloud' in parsed_url.hostname or '.weaviate.network' in parsed_url.hostname
+        # Built here so a bad URL or missing key is reported as a failed probe;
+        # the client is closed with the stack once it exists
+        async_client = create_async_client(weaviate_api_key)
+        stack.push_async_callback(async_client.close)
+        await async_client.connect()
         
-        if is_weaviate_cloud:
-            async_client = weaviate.use_async_with_weaviate_cloud(
-                cluster_url=weaviate_url,
-                auth_credentials=weaviate.auth.Auth.api_key(weaviate_api_key)
-            )
-        else:
-            http_host = parsed_url.hostname
-            http_port = parsed_url.port or (443 if parsed_url.scheme == 'https' else 8080)
-            http_secure = parsed_url.scheme == 'https'
-            grpc_port = 50051
-            grpc_secure = http_secure
-            
-            async_client = weaviate.use_async_with_custom(
-                http_host=http_host,
-                http_port=http_port,
-                http_secure=http_secure,
-                grpc_host=http_host,
-                grpc_port=grpc_port,
-                grpc_secure=grpc_secure,
-                auth_credentials=weaviate.auth.Auth.api_key(weaviate_api_key) if weaviate_api_key else None
-            )
-        
-        async with async_client:
-            # Try to list collections
-            collections = await async_client.collections.list_all()
-            print(f"✅ gRPC connection successful")
-            print(f"   Connected to {len(collections)} collections")
+        # Try to list collections
+        collections = await async_client.collections.list_all()
+        print(f"✅ gRPC connection successful", file=out)
+        print(f"   Connected to {len(collections)} collections", file=out)
+        for name in collections:
+            print(f"   - {name}", file=out)
+        return True
             
     except Exception as e:
-        print(f"❌ gRPC connection failed: {str(e)}")
+        print(f"❌ gRPC connection failed: {str(e)}", file=out)
         if "no healthy upstream" in str(e):
-            print("   This suggests the gRPC service is down or unreachable")
+            print("   This suggests the gRPC service is down or unreachable", file=out)
         elif "reset reason: connection termination" in str(e):
-            print("   The connection was terminated - the instance might be restarting")
-    
-    # 3. Check with minimal connection (no gRPC)
-    print("\n3. Trying REST-only connection...")
+            print("   The connection was terminated - the instance might be restarting", file=out)
+    return False
+
+async def check_schema(http_client, out=sys.stdout):
+    """3. Check the schema over plain REST (no gRPC)."""
+    print("\n3. Checking REST-only schema access...", file=out)
     try:
-        # Create a simple client with only REST (no gRPC)
-        from weaviate import Client
-        simple_client = Client(
-            url=weaviate_url,
-            auth_client_secret=weaviate.auth.Auth.api_key(weaviate_api_key) if weaviate_api_key else None
+        response = await http_client.get("/v1/schema")
+        if response.status_code == 200:
+            data = response.json()
+            print(f"✅ Schema endpoint accessible", file=out)
+            print(f"   Found {len(data.get('classes', []))} classes", file=out)
+            for cls in data.get('classes', []):
+                print(f"   - {cls['class']}", file=out)
+        else:
+            print(f"❌ Schema endpoint returned status: {response.status_code}", file=out)
+                
+    except Exception as e:
+        print(f"❌ REST-only schema access failed: {str(e)}", file=out)
+
+async def check_weaviate_health():
+    """Check various aspects of Weaviate connectivity."""
+    
+    weaviate_url = WEAVIATE_URL
+    weaviate_api_key = os.getenv("WEAVIATE_API_KEY")
+    
+    if not weaviate_url:
+        print("❌ WEAVIATE_URL environment variable not set!")
+        return
+    
+    print(f"🔍 Checking Weaviate instance at: {weaviate_url}")
+    print("-" * 50)
+    
+    # Share one HTTP client and one Weaviate client across all probes
+    async with AsyncExitStack() as stack:
+        # Auth header is set once on the client and reused by every request; HTTP/2 (when
+        # h2 is available) lets the REST probes share a single TLS connection
+        headers = {"Authorization": f"Bearer {weaviate_api_key}"} if weaviate_api_key else {}
+        http_client = await stack.enter_async_context(
+            httpx.AsyncClient(http2=_HTTP2, headers=headers, base_url=weaviate_url)
         )
+
+        # Probes run concurrently; each buffers its output so the report prints in order
+        rest_out, grpc_out = io.StringIO(), io.StringIO()
+        rest_ok, grpc_ok = await asyncio.gather(
+            check_rest(http_client, rest_out),
+            check_grpc(stack, weaviate_api_key, grpc_out)
+        )
+        sys.stdout.write(rest_out.getvalue())
+        sys.stdout.write(grpc_out.getvalue())
         
-        # Try to get schema
-        schema = simple_client.schema.get()
-        print(f"✅ REST-only connection successful")
-        print(f"   Schema has {len(schema.get('classes', []))} classes")
-        
-    except Exception as e:
-        print(f"❌ REST-only connection failed: {str(e)}")
+        # Listing collections over gRPC already proves schema access, so the
+        # REST-only fallback is only needed to tell a gRPC outage apart
+        if rest_ok and not grpc_ok:
+            await check_schema(http_client)
+        elif grpc_ok:
+            print("\n3. Skipping REST-only schema check (gRPC connection succeeded)")
+        else:
+            print("\n3. Skipping REST-only schema check (REST API is unreachable)")
     
     print("\n" + "=" * 50)
     print("Diagnosis Summary:")
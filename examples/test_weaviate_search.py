@@ -12,6 +12,7 @@ Required environment variables:
 
 import asyncio
 import os
+import sys
 from dotenv import load_dotenv
 from open_deep_research.utils import azureaisearch_search_async
 
@@ -39,7 +40,9 @@ async def test_weaviate_search():
             search_queries=search_queries,
             max_results=3,
             topic="general",  # Note: This parameter is currently unused with Weaviate
-            include_raw_content=True
+            include_raw_content=False,
+            # Fetch only what is printed below rather than every text property
+            return_properties=['file_name', 'file_link', 'page_content']
         )
         
         # Display results
@@ -53,10 +56,14 @@ async def test_weaviate_search():
                 continue
                 
             for i, result in enumerate(result_set.get("results", []), 1):
-                print(f"\n{i}. {result.get('title', 'No title')}")
-                print(f"   URL: {result.get('url', 'No URL')}")
-                print(f"   Score: {result.get('score', 'No score')}")
-                print(f"   Content: {result.get('content', 'No content')[:200]}...")
+                # Emit each result with a single write
+                parts = [
+                    f"\n{i}. {result.get('title', 'No title')}",
+                    f"   URL: {result.get('url', 'No URL')}",
+                    f"   Score: {result.get('score', 'No score')}",
+                    f"   Content: {result.get('content', 'No content')[:200]}..."
+                ]
+                sys.stdout.write("\n".join(parts) + "\n")
                 
     except Exception as e:
         print(f"Error during search: {str(e)}")
@@ -36,7 +36,9 @@ async def test_search():
             search_queries=search_queries,
             max_results=3,
             topic="general",
-            include_raw_content=True
+            include_raw_content=False,
+            # Fetch only what is printed below rather than every text property
+            return_properties=['file_name', 'file_link', 'page_content']
         )
         
         # Display results
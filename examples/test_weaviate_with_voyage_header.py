@@ -3,10 +3,14 @@ Test script that passes VoyageAI API key through headers.
 """
 
 import os
+import sys
+import time
 import asyncio
+import logging
 from dotenv import load_dotenv
-import weaviate
-from urllib.parse import urlparse
+from open_deep_research.utils import azureaisearch_search_async, get_first_env, get_weaviate_async_client
+
+log = logging.getLogger(__name__)
 
 # Load existing environment variables
 load_dotenv()
@@ -18,7 +22,7 @@ async def test_search():
     """Test the Weaviate search with VoyageAI API key in headers."""
     
     # Get the VoyageAI API key from environment
-    voyage_api_key = os.getenv('VOYAGE_APIKEY') or os.getenv('VOYAGE_API_KEY') or os.getenv('VOYAGEAI_APIKEY')
+    voyage_api_key = get_first_env('VOYAGE_APIKEY', 'VOYAGE_API_KEY', 'VOYAGEAI_APIKEY')
     
     if not voyage_api_key:
         print("No VoyageAI API key found in environment variables!")
@@ -27,50 +31,17 @@ async def test_search():
     
     # Get Weaviate connection details
     weaviate_url = os.getenv("WEAVIATE_URL")
-    weaviate_api_key = os.getenv("WEAVIATE_API_KEY")
     
     print(f"Connecting to Weaviate at: {weaviate_url}")
     print(f"Using VoyageAI API key: {voyage_api_key[:10]}...")
     
-    # Parse the URL to determine if it's Weaviate Cloud
-    parsed_url = urlparse(weaviate_url)
-    is_weaviate_cloud = '.weaviate.cloud' in parsed_url.hostname or '.weaviate.network' in parsed_url.hostname
-    
-    if is_weaviate_cloud:
-        # For Weaviate Cloud, use the helper function with headers
-        async_client = weaviate.use_async_with_weaviate_cloud(
-            cluster_url=weaviate_url,
-            auth_credentials=weaviate.auth.Auth.api_key(weaviate_api_key),
-            headers={
-                'X-VoyageAI-Api-Key': voyage_api_key  # Pass VoyageAI key in headers
-            }
-        )
-    else:
-        # For custom instances
-        http_host = parsed_url.hostname
-        http_port = parsed_url.port or (443 if parsed_url.scheme == 'https' else 8080)
-        http_secure = parsed_url.scheme == 'https'
-        grpc_port = 50051
-        grpc_secure = http_secure
-        
-        async_client = weaviate.use_async_with_custom(
-            http_host=http_host,
-            http_port=http_port,
-            http_secure=http_secure,
-            grpc_host=http_host,
-            grpc_port=grpc_port,
-            grpc_secure=grpc_secure,
-            auth_credentials=weaviate.auth.Auth.api_key(weaviate_api_key) if weaviate_api_key else None,
-            headers={
-                'X-VoyageAI-Api-Key': voyage_api_key  # Pass VoyageAI key in headers
-            }
-        )
+    # Build a single client carrying the VoyageAI key; it is reused for every query below
+    async_client = get_weaviate_async_client(headers={
+        'X-VoyageAI-Api-Key': voyage_api_key  # Pass VoyageAI key in headers
+    })
     
     async with async_client:
         try:
-            # Import the search function
-            from open_deep_research.utils import azureaisearch_search_async
-            
             # Test queries
             search_queries = [
                 "machine learning algorithms",
@@ -82,13 +53,22 @@ async def test_search():
             print(f"Testing with queries: {search_queries}")
             print("-" * 50)
             
-            # Perform the search
+            # Warm up the connection (gRPC channel, DNS, TLS) before timing the searches
+            collection = async_client.collections.get(os.getenv('WEAVIATE_COLLECTION_NAME'))
+            await collection.query.fetch_objects(limit=1)
+            
+            # Perform all searches concurrently over the already open connection
+            start_time = time.perf_counter()
             results = await azureaisearch_search_async(
                 search_queries=search_queries,
                 max_results=3,
                 topic="general",
-                include_raw_content=True
+                include_raw_content=False,
+                # Fetch only what is printed below rather than every text property
+                return_properties=['file_name', 'file_link', 'page_content'],
+                async_client=async_client
             )
+            print(f"Searches completed in {time.perf_counter() - start_time:.2f}s")
             
             # Display results
             for result_set in results:
@@ -106,20 +86,24 @@ async def test_search():
                     continue
                     
                 for i, result in enumerate(results_list, 1):
-                    print(f"\n{i}. Title: {result.get('title', 'No title')}")
-                    print(f"   URL: {result.get('url', 'No URL')}")
-                    print(f"   Score: {result.get('score', 'No score')}")
+                    parts = [
+                        f"\n{i}. Title: {result.get('title', 'No title')}",
+                        f"   URL: {result.get('url', 'No URL')}",
+                        f"   Score: {result.get('score', 'No score')}"
+                    ]
                     
                     content = result.get('content', 'No content')
                     if content:
                         # Show first 200 characters of content
                         preview = content[:200] + "..." if len(content) > 200 else content
-                        print(f"   Content: {preview}")
+                        parts.append(f"   Content: {preview}")
+                    
+                    # Emit each result with a single write
+                    sys.stdout.write("\n".join(parts) + "\n")
                         
-        except Exception as e:
-            print(f"Error during search: {str(e)}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            log.exception("Error during search")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     asyncio.run(test_search()) 
\ No newline at end of file
@@ -3,8 +3,14 @@ Test script with correct environment variables for Weaviate.
 """
 
 import os
+import sys
+import time
 import asyncio
+import logging
 from dotenv import load_dotenv
+from open_deep_research.utils import azureaisearch_search_async, get_first_env, get_weaviate_async_client
+
+log = logging.getLogger(__name__)
 
 # Load existing environment variables
 load_dotenv()
@@ -12,13 +18,9 @@ load_dotenv()
 # Set the correct environment variables
 os.environ['WEAVIATE_COLLECTION_NAME'] = 'Text_tables'
 # Copy the VoyageAI API key to the correct environment variable name
-if 'VOYAGE_APIKEY' in os.environ:
-    os.environ['VOYAGEAI_APIKEY'] = os.environ['VOYAGE_APIKEY']
-elif 'VOYAGE_API_KEY' in os.environ:
-    os.environ['VOYAGEAI_APIKEY'] = os.environ['VOYAGE_API_KEY']
-
-# Now import and run the search function
-from open_deep_research.utils import azureaisearch_search_async
+voyage_api_key = get_first_env('VOYAGE_APIKEY', 'VOYAGE_API_KEY')
+if voyage_api_key:
+    os.environ['VOYAGEAI_APIKEY'] = voyage_api_key
 
 async def test_search():
     """Test the Weaviate search with correct environment variables."""
@@ -36,13 +38,27 @@ async def test_search():
     print("-" * 50)
     
     try:
-        # Perform the search
-        results = await azureaisearch_search_async(
-            search_queries=search_queries,
-            max_results=3,
-            topic="general",
-            include_raw_content=True
-        )
+        headers = {}
+        if 'VOYAGEAI_APIKEY' in os.environ:
+            headers['X-VoyageAI-Api-Key'] = os.environ['VOYAGEAI_APIKEY']
+        
+        async with get_weaviate_async_client(headers) as async_client:
+            # Warm up the connection (gRPC channel, DNS, TLS) before timing the searches
+            collection = async_client.collections.get(os.getenv('WEAVIATE_COLLECTION_NAME'))
+            await collection.query.fetch_objects(limit=1)
+            
+            # Perform the search
+            start_time = time.perf_counter()
+            results = await azureaisearch_search_async(
+                search_queries=search_queries,
+                max_results=3,
+                topic="general",
+                include_raw_content=False,
+                # Fetch only what is printed below rather than every text property
+                return_properties=['file_name', 'file_link', 'page_content'],
+                async_client=async_client
+            )
+            print(f"Searches completed in {time.perf_counter() - start_time:.2f}s")
         
         # Display results
         for result_set in results:
@@ -60,20 +76,24 @@ async def test_search():
                 continue
                 
             for i, result in enumerate(results_list, 1):
-                print(f"\n{i}. Title: {result.get('title', 'No title')}")
-                print(f"   URL: {result.get('url', 'No URL')}")
-                print(f"   Score: {result.get('score', 'No score')}")
+                parts = [
+                    f"\n{i}. Title: {result.get('title', 'No title')}",
+                    f"   URL: {result.get('url', 'No URL')}",
+                    f"   Score: {result.get('score', 'No score')}"
+                ]
                 
                 content = result.get('content', 'No content')
                 if content:
                     # Show first 200 characters of content
                     preview = content[:200] + "..." if len(content) > 200 else content
-                    print(f"   Content: {preview}")
+                    parts.append(f"   Content: {preview}")
+                
+                # Emit each result with a single write
+                sys.stdout.write("\n".join(parts) + "\n")
                 
-    except Exception as e:
-        print(f"Error during search: {str(e)}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        log.exception("Error during search")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     asyncio.run(test_search()) 
\ No newline at end of file
@@ -1,22 +1,21 @@
 import os
 import asyncio
+import logging
 import requests
 import random 
 import concurrent
 import aiohttp
 import httpx
 import time
-from typing import List, Optional, Dict, Any, Union, Literal
-from urllib.parse import unquote, urlparse
+from functools import lru_cache
+from typing import TYPE_CHECKING, List, Optional, Dict, Any, Union, Literal
+from urllib.parse import unquote, urlsplit
 
 from exa_py import Exa
 from linkup import LinkupClient
 from tavily import AsyncTavilyClient
 from azure.core.credentials import AzureKeyCredential
 from azure.search.documents.aio import SearchClient as AsyncAzureAISearchClient
-import weaviate
-from weaviate import WeaviateAsyncClient
-import weaviate.auth
 import asyncio
 import os
 from duckduckgo_search import DDGS 
@@ -31,7 +30,15 @@ from langsmith import traceable
 
 from open_deep_research.state import Section
 
+if TYPE_CHECKING:
+    from weaviate import WeaviateAsyncClient
+
+logger = logging.getLogger(__name__)
+
 MAX_RESULTS_PER_QUERY = 100
+MAX_CONCURRENT_WEAVIATE_QUERIES = 10  # Keeps concurrent vectorizer calls under VoyageAI rate limits
+# Properties fetched for each Weaviate hit by default, based on the Text_tables schema
+WEAVIATE_RETURN_PROPERTIES = ['file_name', 'file_link', 'website_url', 'page_content', 'text', 'summary', 'source', 'data_source_id']
     
 def get_config_value(value):
     """
@@ -192,187 +199,283 @@ async def tavily_search_async(search_queries, max_results: int = 5, topic: Liter
     search_docs = await asyncio.gather(*search_tasks)
     return search_docs
 
+@lru_cache(maxsize=8)
+def _parse_weaviate_url(weaviate_url: str) -> tuple[bool, str | None, int, bool]:
+    """Split a Weaviate URL into (is_weaviate_cloud, host, http_port, http_secure)."""
+    parsed_url = urlsplit(weaviate_url)
+    host = parsed_url.hostname
+    is_weaviate_cloud = bool(host) and host.endswith(('.weaviate.cloud', '.weaviate.network'))
+    http_secure = parsed_url.scheme == 'https'
+    http_port = parsed_url.port or (443 if http_secure else 8080)
+    return is_weaviate_cloud, host, http_port, http_secure
+
+def get_first_env(*names: str) -> str | None:
+    """Return the value of the first environment variable in names that is set and non-empty."""
+    return next((os.environ[name] for name in names if os.environ.get(name)), None)
+
+def get_weaviate_async_client(headers: Dict[str, str] | None = None) -> "WeaviateAsyncClient":
+    """Create an async Weaviate client from the WEAVIATE_URL and WEAVIATE_API_KEY environment variables.
+
+    WEAVIATE_API_KEY is required for Weaviate Cloud and optional for custom instances.
+
+    The client is returned unconnected; use it as an async context manager to open the connection.
+
+    Args:
+        headers (Optional[Dict[str, str]]): additional headers to send with every request (e.g. vectorizer API keys)
+
+    Returns:
+        WeaviateAsyncClient: client for Weaviate Cloud or a custom Weaviate instance
+    """
+    # Imported lazily: the Weaviate client pulls in grpc/protobuf and is only needed for this search API
+    import weaviate
+    import weaviate.auth
+
+    # Ensure the URL is set; the API key is optional for custom (e.g. local) instances
+    if "WEAVIATE_URL" not in os.environ:
+        raise ValueError("Missing required environment variable for Weaviate: WEAVIATE_URL")
+    
+    weaviate_url = os.getenv("WEAVIATE_URL")
+    weaviate_api_key = os.getenv("WEAVIATE_API_KEY")
+    headers = headers or {}
+    
+    # Parse the URL to extract host and port, and determine if this is a Weaviate Cloud instance
+    is_weaviate_cloud, http_host, http_port, http_secure = _parse_weaviate_url(weaviate_url)
+    
+    if is_weaviate_cloud:
+        if not weaviate_api_key:
+            raise ValueError("Missing required environment variable for Weaviate Cloud: WEAVIATE_API_KEY")
+        # For Weaviate Cloud, use the helper function
+        return weaviate.use_async_with_weaviate_cloud(
+            cluster_url=weaviate_url,
+            auth_credentials=weaviate.auth.Auth.api_key(weaviate_api_key),
+            headers=headers
+        )
+
+    # For gRPC, assume standard port unless specified
+    grpc_port = 50051
+    grpc_secure = http_secure
+    
+    return weaviate.use_async_with_custom(
+        http_host=http_host,
+        http_port=http_port,
+        http_secure=http_secure,
+        grpc_host=http_host,
+        grpc_port=grpc_port,
+        grpc_secure=grpc_secure,
+        auth_credentials=weaviate.auth.Auth.api_key(weaviate_api_key) if weaviate_api_key else None,
+        headers=headers
+    )
+
+# Connected Weaviate client shared by callers that own a shutdown path, on the event loop
+# that created it. Only one loop is tracked: the client's gRPC channel is bound to its loop,
+# so it must be closed with close_shared_weaviate_async_client() before that loop ends.
+_shared_weaviate_client: "WeaviateAsyncClient | None" = None
+_shared_weaviate_loop: asyncio.AbstractEventLoop | None = None
+_shared_weaviate_lock: asyncio.Lock | None = None
+
+def _voyage_headers() -> Dict[str, str]:
+    """Return the VoyageAI vectorizer header, if an API key is set in the environment."""
+    voyage_api_key = get_first_env('VOYAGEAI_APIKEY', 'VOYAGE_APIKEY', 'VOYAGE_API_KEY')
+    return {'X-VoyageAI-Api-Key': voyage_api_key} if voyage_api_key else {}
+
+async def get_shared_weaviate_async_client() -> "WeaviateAsyncClient":
+    """Return a connected Weaviate client for the running event loop, connecting on first use.
+
+    Reusing the client avoids a new HTTP/gRPC handshake and auth round trip for every search call.
+    The VoyageAI API key, if set, is sent with every request. Call
+    close_shared_weaviate_async_client() before the event loop shuts down.
+
+    Returns:
+        WeaviateAsyncClient: connected client shared by all searches on the current event loop
+    """
+    global _shared_weaviate_client, _shared_weaviate_loop, _shared_weaviate_lock
+
+    loop = asyncio.get_running_loop()
+    if _shared_weaviate_loop is not loop:
+        if _shared_weaviate_client is not None:
+            # Its channel is bound to the old loop, so it can no longer be closed from here
+            logger.warning("Discarding a shared Weaviate client that was not closed before its event loop ended")
+        _shared_weaviate_client = None
+        _shared_weaviate_loop = loop
+        _shared_weaviate_lock = asyncio.Lock()
+
+    async with _shared_weaviate_lock:
+        if _shared_weaviate_client is None or not _shared_weaviate_client.is_connected():
+            async_client = get_weaviate_async_client(_voyage_headers())
+            await async_client.connect()
+            _shared_weaviate_client = async_client
+        return _shared_weaviate_client
+
+async def close_shared_weaviate_async_client() -> None:
+    """Close the shared Weaviate client, if one is open on the running event loop.
+
+    The next call to get_shared_weaviate_async_client() opens a fresh connection.
+    """
+    global _shared_weaviate_client, _shared_weaviate_loop, _shared_weaviate_lock
+
+    async_client, loop = _shared_weaviate_client, _shared_weaviate_loop
+    _shared_weaviate_client = _shared_weaviate_loop = _shared_weaviate_lock = None
+    # A client opened on another loop cannot be closed from this one
+    if async_client is not None and loop is asyncio.get_running_loop():
+        await async_client.close()
+
 @traceable
-async def azureaisearch_search_async(search_queries: list[str], max_results: int = 100, topic: str = "general", include_raw_content: bool = True) -> list[dict]:
+async def azureaisearch_search_async(search_queries: list[str], max_results: int = 100, topic: str = "general", include_raw_content: bool = True, async_client: "WeaviateAsyncClient | None" = None, return_properties: list[str] | None = None) -> list[dict]:
     """
     Performs concurrent web searches using the Weaviate vector database.
 
+    All queries are issued concurrently over a single Weaviate connection. Pass a connected client
+    (e.g. from get_shared_weaviate_async_client) to reuse it across calls; otherwise a connection is
+    opened for this call and closed when its searches finish.
+
     Args:
         search_queries (List[str]): list of search queries to process
         max_results (int): maximum number of results to return for each query
         topic (str): semantic topic filter for the search (currently unused with Weaviate)
         include_raw_content (bool): whether to include raw content in results
+        async_client (Optional[WeaviateAsyncClient]): an already connected client to use; it is left
+            open for the caller to close. If omitted, a client is opened and closed by this call
+        return_properties (Optional[List[str]]): object properties to fetch for each hit; defaults to
+            WEAVIATE_RETURN_PROPERTIES. Fetching fewer properties is what shrinks the response, since
+            raw_content reuses the content property rather than fetching anything extra
 
     Returns:
         List[dict]: list of search responses from Weaviate, one per query.
     """
-    print(f"max_results: {max_results}")
+    logger.debug("Weaviate search: %d queries, max_results=%d", len(search_queries), max_results)
     # Define filters inside the function
     # You can modify this filters variable as needed
     filters = {"data_source_id": "e89cb0a2-2187-489e-b942-9154faa7c3f0"}  # Example: {"data_source_id": "source123"} or {"data_source_id": ["source1", "source2"]}
     
-    # Configure and create the Weaviate client
-    # Ensure all environment variables are set
-    required_vars = ["WEAVIATE_URL", "WEAVIATE_API_KEY"]
-    if not all(var in os.environ for var in required_vars):
-        raise ValueError(f"Missing required environment variables for Weaviate which are: {', '.join(required_vars)}")
-    
-    weaviate_url = os.getenv("WEAVIATE_URL")
-    weaviate_api_key = os.getenv("WEAVIATE_API_KEY")
-    
     # Get collection name from environment or use default
     collection_name = os.getenv("WEAVIATE_COLLECTION_NAME", "Documents")
     
-    # Get VoyageAI API key from environment
-    voyage_api_key = os.getenv('VOYAGEAI_APIKEY') or os.getenv('VOYAGE_APIKEY') or os.getenv('VOYAGE_API_KEY')
-    headers = {}
-    if voyage_api_key:
-        headers['X-VoyageAI-Api-Key'] = voyage_api_key
-    
-    # Parse the URL to extract host and port
-    parsed_url = urlparse(weaviate_url)
-    
-    # Determine if this is a Weaviate Cloud instance
-    is_weaviate_cloud = '.weaviate.cloud' in parsed_url.hostname or '.weaviate.network' in parsed_url.hostname
-    
-    if is_weaviate_cloud:
-        # For Weaviate Cloud, use the helper function
-        async_client = weaviate.use_async_with_weaviate_cloud(
-            cluster_url=weaviate_url,
-            auth_credentials=weaviate.auth.Auth.api_key(weaviate_api_key),
-            headers=headers
-        )
-    else:
-        # For custom instances, parse the URL components
-        http_host = parsed_url.hostname
-        http_port = parsed_url.port or (443 if parsed_url.scheme == 'https' else 8080)
-        http_secure = parsed_url.scheme == 'https'
+    # Build filter for the hybrid search once; it is the same for every query
+    filter_obj = None
+    if filters:
+        # Import Weaviate filter classes
+        import weaviate.classes as wvc
         
-        # For gRPC, assume standard port unless specified
-        grpc_port = 50051
-        grpc_secure = http_secure
+        # Build filter conditions
+        filter_conditions = []
+        for prop_name, prop_value in filters.items():
+            if isinstance(prop_value, list):
+                # If value is a list, use contains_any
+                filter_conditions.append(
+                    wvc.query.Filter.by_property(prop_name).contains_any(prop_value)
+                )
+            else:
+                # For single values, use exact match
+                filter_conditions.append(
+                    wvc.query.Filter.by_property(prop_name).equal(prop_value)
+                )
         
-        async_client = weaviate.use_async_with_custom(
-            http_host=http_host,
-            http_port=http_port,
-            http_secure=http_secure,
-            grpc_host=http_host,
-            grpc_port=grpc_port,
-            grpc_secure=grpc_secure,
-            auth_credentials=weaviate.auth.Auth.api_key(weaviate_api_key) if weaviate_api_key else None,
-            headers=headers
-        )
+        # Combine all filters with AND logic
+        if len(filter_conditions) == 1:
+            filter_obj = filter_conditions[0]
+        else:
+            # Chain filters with AND operator using &
+            filter_obj = filter_conditions[0]
+            for condition in filter_conditions[1:]:
+                filter_obj = filter_obj & condition
     
-    async with async_client:
-        async def do_search(query: str) -> dict:
-            max_retries = 3
-            retry_delay = 1.0  # Start with 1 second delay
-            
-            for attempt in range(max_retries):
+    # Without a caller-provided client, open one for this call and close it once the searches finish
+    owns_client = async_client is None
+    if owns_client:
+        async_client = get_weaviate_async_client(_voyage_headers())
+
+    # Get the collection handle once and share it across all queries and retries
+    collection = async_client.collections.get(collection_name)
+
+    async def do_search(query: str) -> dict:
+        max_retries = 3
+        retry_delay = 1.0  # Start with 1 second delay
+        
+        for attempt in range(max_retries):
+            try:
+                # Perform hybrid search with filters
+                hybrid_kwargs = {
+                    "query": query,
+                    "limit": max_results,
+                    "alpha": 0.7,  # Favors vector search
+                }
+                
+                # Add filters if they were provided
+                if filter_obj:
+                    hybrid_kwargs["filters"] = filter_obj
+                
+                # Specify properties to return; an explicit empty list is passed through as-is
+                hybrid_kwargs["return_properties"] = WEAVIATE_RETURN_PROPERTIES if return_properties is None else return_properties
+                
+                # Add query complexity reduction for very long queries
+                if len(query) > 500:  # If query is very long, truncate it
+                    query = query[:500] + "..."
+                    hybrid_kwargs["query"] = query
+                
+                # Execute query with timeout
                 try:
-                    # Get the collection
-                    collection = async_client.collections.get(collection_name)
-                    
-                    # Build filter for the hybrid search
-                    filter_obj = None
-                    if filters:
-                        # Import Weaviate filter classes
-                        import weaviate.classes as wvc
-                        
-                        # Build filter conditions
-                        filter_conditions = []
-                        for prop_name, prop_value in filters.items():
-                            if isinstance(prop_value, list):
-                                # If value is a list, use contains_any
-                                filter_conditions.append(
-                                    wvc.query.Filter.by_property(prop_name).contains_any(prop_value)
-                                )
-                            else:
-                                # For single values, use exact match
-                                filter_conditions.append(
-                                    wvc.query.Filter.by_property(prop_name).equal(prop_value)
-                                )
-                        
-                        # Combine all filters with AND logic
-                        if len(filter_conditions) == 1:
-                            filter_obj = filter_conditions[0]
-                        else:
-                            # Chain filters with AND operator using &
-                            filter_obj = filter_conditions[0]
-                            for condition in filter_conditions[1:]:
-                                filter_obj = filter_obj & condition
-                    
-                    # Perform hybrid search with filters
-                    hybrid_kwargs = {
-                        "query": query,
-                        "limit": max_results,
-                        "alpha": 0.7,  # Favors vector search
-                    }
-                    
-                    # Add filters if they were provided
-                    if filter_obj:
-                        hybrid_kwargs["filters"] = filter_obj
+                    response = await asyncio.wait_for(
+                        collection.query.hybrid(**hybrid_kwargs),
+                        timeout=30.0  # 30 second timeout
+                    )
+                except asyncio.TimeoutError:
+                    raise Exception("DEADLINE_EXCEEDED: Query timed out after 30 seconds")
+                
+                # Convert Weaviate response to expected format
+                results = []
+                for obj in response.objects:
+                    # Get properties from the object
+                    properties = obj.properties
                     
-                    # Specify properties to return based on Text_tables schema
-                    hybrid_kwargs["return_properties"] = ['file_name', 'file_link', 'website_url', 'page_content', 'text', 'summary', 'source', 'data_source_id']
+                    # Map Text_tables properties to expected format
+                    # For title: use file_name or source
+                    title = properties.get("file_name", properties.get("source", ""))
                     
-                    # Add query complexity reduction for very long queries
-                    if len(query) > 500:  # If query is very long, truncate it
-                        query = query[:500] + "..."
-                        hybrid_kwargs["query"] = query
+                    # For URL: prefer file_link, then website_url
+                    url = properties.get("file_link", properties.get("website_url", ""))
                     
-                    # Execute query with timeout
-                    try:
-                        response = await asyncio.wait_for(
-                            collection.query.hybrid(**hybrid_kwargs),
-                            timeout=30.0  # 30 second timeout
-                        )
-                    except asyncio.TimeoutError:
-                        raise Exception("DEADLINE_EXCEEDED: Query timed out after 30 seconds")
+                    # For content: prefer page_content, then text, then summary
+                    content = properties.get("page_content", properties.get("text", properties.get("summary", "")))
                     
-                    # Convert Weaviate response to expected format
-                    results = []
-                    for obj in response.objects:
-                        # Get properties from the object
-                        properties = obj.properties
-                        
-                        # Map Text_tables properties to expected format
-                        # For title: use file_name or source
-                        title = properties.get("file_name", properties.get("source", ""))
-                        
-                        # For URL: prefer file_link, then website_url
-                        url = properties.get("file_link", properties.get("website_url", ""))
-                        
-                        # For content: prefer page_content, then text, then summary
-                        content = properties.get("page_content", properties.get("text", properties.get("summary", "")))
-                        
-                        # Build result dict matching expected format
-                        result_dict = {
-                            "title": title,
-                            "url": url,
-                            "content": content,
-                            "score": obj.metadata.score if hasattr(obj.metadata, 'score') else 0.0,
-                            "raw_content": content if include_raw_content else None,
-                            "data_source_id": properties.get("data_source_id")  # Include data_source_id in results
-                        }
-                        results.append(result_dict)
-                    
-                    return {"query": query, "results": results}
-                    
-                except Exception as e:
-                    error_str = str(e)
-                    if "DEADLINE_EXCEEDED" in error_str and attempt < max_retries - 1:
-                        print(f"Deadline exceeded for query '{query[:50]}...', retrying in {retry_delay}s (attempt {attempt + 1}/{max_retries})")
-                        await asyncio.sleep(retry_delay)
-                        retry_delay *= 2  # Exponential backoff
-                        continue
-                    else:
-                        print(f"Error searching Weaviate for query '{query}': {error_str}")
-                        return {"query": query, "results": [], "error": error_str}
+                    # Build result dict matching expected format
+                    result_dict = {
+                        "title": title,
+                        "url": url,
+                        "content": content,
+                        "score": obj.metadata.score if hasattr(obj.metadata, 'score') else 0.0,
+                        "raw_content": content if include_raw_content else None,
+                        "data_source_id": properties.get("data_source_id")  # Include data_source_id in results
+                    }
+                    results.append(result_dict)
+                
+                return {"query": query, "results": results}
+                
+            except Exception as e:
+                error_str = str(e)
+                if "DEADLINE_EXCEEDED" in error_str and attempt < max_retries - 1:
+                    logger.warning("Deadline exceeded for query '%.50s...', retrying in %ss (attempt %d/%d)", query, retry_delay, attempt + 1, max_retries)
+                    await asyncio.sleep(retry_delay)
+                    retry_delay *= 2  # Exponential backoff
+                    continue
+                else:
+                    logger.error("Error searching Weaviate for query '%s': %s", query, error_str)
+                    return {"query": query, "results": [], "error": error_str}
+
+    # Parallelize the search queries, capping how many run at once
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_WEAVIATE_QUERIES)
+
+    async def bounded_search(query: str) -> dict:
+        async with semaphore:
+            return await do_search(query)
 
-        # Parallelize the search queries
-        tasks = [do_search(q) for q in search_queries]
+    try:
+        if owns_client:
+            await async_client.connect()
+        tasks = [bounded_search(q) for q in search_queries]
         return await asyncio.gather(*tasks)
+    finally:
+        if owns_client:
+            await async_client.close()
 
 @traceable
 def perplexity_search(search_queries):
@@ -1514,6 +1617,8 @@ async def azureaisearch_search(queries: List[str], max_results: int = MAX_RESULT
         str: A formatted string of search results
     """
     # Use azureaisearch_search_async with include_raw_content=True to get content directly
+    # No client is passed: the graph has no shutdown hook to close a shared client
+    # (see close_shared_weaviate_async_client), so each call opens and closes its own
     search_results = await azureaisearch_search_async(
         queries,
         max_results=max_results,
@@ -1566,7 +1671,7 @@ async def select_and_execute_search(search_api: str, query_list: list[str], para
     Raises:
         ValueError: If an unsupported search API is specified
     """
-    print(f"query_list: {query_list} params_to_pass: {params_to_pass}")
+    logger.debug("query_list: %s params_to_pass: %s", query_list, params_to_pass)
     if search_api == "tavily":
         # Tavily search tool used with both workflow and agent 
         return await tavily_search.ainvoke({'queries': query_list}, **params_to_pass)
@@ -1615,6 +1720,8 @@ async def search_documents_with_azure_ai(query_list: List[str], configurable) ->
 
     # Use existing azureaisearch_search_async function
     # The filters are already configured in the Azure AI Search instance
+    # No client is passed: the graph has no shutdown hook to close a shared client
+    # (see close_shared_weaviate_async_client), so each call opens and closes its own
     search_results = await azureaisearch_search_async(
         search_queries=query_list,
         max_results=MAX_RESULTS_PER_QUERY,
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from open_deep_research import utils
+
+
+def make_client(connected=True):
+    """Create a mock Weaviate async client."""
+    client = MagicMock()
+    client.connect = AsyncMock()
+    client.close = AsyncMock()
+    client.is_connected.return_value = connected
+    return client
+
+
+def test_shared_client_is_reused():
+    """The shared client is connected once and reused on the same loop."""
+    client = make_client()
+
+    async def run():
+        try:
+            first = await utils.get_shared_weaviate_async_client()
+            second = await utils.get_shared_weaviate_async_client()
+            return first, second
+        finally:
+            await utils.close_shared_weaviate_async_client()
+
+    with patch.object(utils, "get_weaviate_async_client", return_value=client) as factory:
+        first, second = asyncio.run(run())
+
+    assert first is second is client
+    factory.assert_called_once()
+    client.connect.assert_awaited_once()
+
+
+def test_shared_client_reconnects_when_disconnected():
+    """A disconnected shared client is replaced with a freshly connected one."""
+    stale, fresh = make_client(), make_client()
+
+    async def run():
+        try:
+            first = await utils.get_shared_weaviate_async_client()
+            stale.is_connected.return_value = False
+            second = await utils.get_shared_weaviate_async_client()
+            return first, second
+        finally:
+            await utils.close_shared_weaviate_async_client()
+
+    with patch.object(utils, "get_weaviate_async_client", side_effect=[stale, fresh]):
+        first, second = asyncio.run(run())
+
+    assert first is stale
+    assert second is fresh
+    fresh.connect.assert_awaited_once()
+
+
+def test_close_shared_client():
+    """Closing the shared client closes it and the next call opens a new one."""
+    first_client, second_client = make_client(), make_client()
+
+    async def run():
+        first = await utils.get_shared_weaviate_async_client()
+        await utils.close_shared_weaviate_async_client()
+        second = await utils.get_shared_weaviate_async_client()
+        await utils.close_shared_weaviate_async_client()
+        return first, second
+
+    with patch.object(utils, "get_weaviate_async_client", side_effect=[first_client, second_client]):
+        first, second = asyncio.run(run())
+
+    assert first is first_client
+    assert second is second_client
+    first_client.close.assert_awaited_once()
+    second_client.close.assert_awaited_once()
+
+
+def test_search_without_client_closes_its_own():
+    """A search without a caller-provided client opens one and closes it afterwards."""
+    client = make_client()
+    client.collections.get.return_value.query.hybrid = AsyncMock(return_value=MagicMock(objects=[]))
+
+    with patch.object(utils, "get_weaviate_async_client", return_value=client):
+        results = asyncio.run(utils.azureaisearch_search_async(["query"], max_results=1))
+
+    assert results == [{"query": "query", "results": []}]
+    client.connect.assert_awaited_once()
+    client.close.assert_awaited_once()